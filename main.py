@@ -2,17 +2,12 @@
 import os
 import pandas as pd
 import warnings
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from pathlib import Path
 
 
 from src.runner import EvaluationRunner
 
-from src.metrics.bertscore import BERTScoreWrapper
-from src.metrics.summac import SummaCWrapper
-from src.metrics.bleurt import BLEURTWrapper
-from src.metrics.bleu import BleuWrapper
-from src.metrics.rouge import RougeWrapper
-from src.metrics.meteor import MeteorWrapper
-
 warnings.filterwarnings("ignore", category=UserWarning, module='torch.utils.data')
 
 
@@ -35,43 +30,52 @@ def load_data_from_files(data_dir: str = 'data') -> pd.DataFrame:
         pd.DataFrame: 包含 `original_text`, `degraded_text`, `degradation_type` 的 DataFrame。
     """
     print(f"读取文本： '{data_dir}' ")
-    records = []
+    # 按列收集而不是按行收集 dict：pd.DataFrame(records) 会逐行做 dict
+    # 查找和 dtype 推断，列字典可以直接走 pandas 的列式构造路径
+    originals = []
+    degradeds = []
+    types = []
     original_file_path = os.path.join(data_dir, 'original.txt')
     degraded_dir_path = os.path.join(data_dir, 'degraded')
 
     try:
-        with open(original_file_path, 'r', encoding='utf-8') as f:
-            original_content = f.read()
+        # read_bytes + 一次性 decode 走单次 C 层解码，
+        # 避免文本模式 io 层的增量解码开销
+        original_content = Path(original_file_path).read_bytes().decode('utf-8')
 
-        records.append({
-            'original_text': original_content,
-            'degraded_text': original_content,
-            'degradation_type': 'Original (Self-comparison)'
-        })
+        originals.append(original_content)
+        degradeds.append(original_content)
+        types.append('Original (Self-comparison)')
 
         # 读取劣化文本
+        # os.scandir 每个目录项只需一次系统调用（dirent 自带类型信息），
+        # 再用线程池并发读取文件，让多个磁盘等待相互重叠
         if os.path.isdir(degraded_dir_path):
-            for filename in os.listdir(degraded_dir_path):
-                if filename.endswith('.txt'):
-                    degradation_type = os.path.splitext(filename)[0]
-                    file_path = os.path.join(degraded_dir_path, filename)
-                    with open(file_path, 'r', encoding='utf-8') as f:
-                        degraded_content = f.read()
-
-                    records.append({
-                        'original_text': original_content,
-                        'degraded_text': degraded_content,
-                        'degradation_type': degradation_type
-                    })
-
-        if len(records) <= 1:  #
+            with os.scandir(degraded_dir_path) as it:
+                entries = [e for e in it if e.name.endswith('.txt') and e.is_file()]
+
+            if entries:
+                def _read_entry(entry):
+                    return entry.name, Path(entry.path).read_bytes().decode('utf-8')
+
+                with ThreadPoolExecutor(max_workers=min(32, len(entries))) as executor:
+                    for filename, degraded_content in executor.map(_read_entry, entries):
+                        originals.append(original_content)
+                        degradeds.append(degraded_content)
+                        types.append(os.path.splitext(filename)[0])
+
+        if len(types) <= 1:  #
             print(f"警告: 在 '{degraded_dir_path}' 中没有找到txt格式的劣化文本。")
 
     except FileNotFoundError:
         print(f"错误: 找不到 '{original_file_path}'。")
         return pd.DataFrame(columns=['original_text', 'degraded_text', 'degradation_type'])
 
-    return pd.DataFrame(records)
+    return pd.DataFrame({
+        'original_text': originals,
+        'degraded_text': degradeds,
+        'degradation_type': types
+    })
 
 
 if __name__ == "__main__":
@@ -80,6 +84,16 @@ if __name__ == "__main__":
     # ===================================================================
     print("正在初始化评估指标")
 
+    # 指标封装只在真正用到时才导入（冷启动导入 torch/transformers 要
+    # 3-8 秒，只跑轻量指标时没必要付这笔开销）
+    from src.metrics.bleu import BleuWrapper
+    from src.metrics.rouge import RougeWrapper
+    from src.metrics.meteor import MeteorWrapper
+
+    # from src.metrics.bertscore import BERTScoreWrapper
+    # from src.metrics.summac import SummaCWrapper
+    # from src.metrics.bleurt import BLEURTWrapper
+
     # bertscore_metric = BERTScoreWrapper(device='cuda')
     # summac_metric = SummaCWrapper(device='cuda')
     # bleurt_metric = BLEURTWrapper(device='cuda')
@@ -87,29 +101,45 @@ if __name__ == "__main__":
     rouge_metric = RougeWrapper()
     meteor_metric = MeteorWrapper()
 
-    metrics_to_run = [
-        # bertscore_metric,
-        # summac_metric,
-        # bleurt_metric,
+    # CPU 指标与 GPU 指标完全独立：CPU 指标丢进进程池后台跑，
+    # GPU 指标留在主进程跑（模型/显存不适合跨进程），
+    # CPU 指标的耗时可以完全藏在 GPU 指标的耗时之下
+    cpu_metrics = [
         bleu_metric,
         rouge_metric,
         meteor_metric
     ]
+    gpu_metrics = [
+        # bertscore_metric,
+        # summac_metric,
+        # bleurt_metric,
+    ]
 
     # ===================================================================
     # 2. 初始化冰进行评估
     # ===================================================================
-    runner = EvaluationRunner(metrics=metrics_to_run)
+    runner = EvaluationRunner(metrics=cpu_metrics + gpu_metrics)
 
     # 载入数据
     sample_data = load_data_from_files()
 
     if not sample_data.empty:
-        results_df = runner.run(
-            data=sample_data,
-            original_col='original_text',
-            degraded_col='degraded_text'
-        )
+        predictions = sample_data['degraded_text'].tolist()
+        references = sample_data['original_text'].tolist()
+
+        results_df = sample_data.copy()
+        with ProcessPoolExecutor(max_workers=max(1, len(cpu_metrics))) as executor:
+            cpu_futures = [
+                executor.submit(metric.compute, predictions, references)
+                for metric in cpu_metrics
+            ]
+            # GPU 指标在主进程串行执行，与后台的 CPU 指标并行
+            all_scores = [metric.compute(predictions, references) for metric in gpu_metrics]
+            all_scores.extend(future.result() for future in cpu_futures)
+
+        for scores_dict in all_scores:
+            for score_name, score_values in scores_dict.items():
+                results_df[score_name] = score_values
 
         # ===================================================================
         # 3. 保存结果
@@ -122,7 +152,7 @@ if __name__ == "__main__":
         print(results_df)
         print("=" * 55)
 
-        output_file_path = 'results/evaluation_scores.csv'
+        output_file_path = 'results/evaluation_scores.parquet'
         runner.save_results(results_df, output_file_path)
     else:
         print("数据为空。")
\ No newline at end of file
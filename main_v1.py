@@ -1,5 +1,3 @@
-import os
-os.environ['HF_ENDPOINT'] = 'https://hf-mirror.com'
 # main.py
 
 """
@@ -21,11 +19,8 @@ import warnings
 # 导入我们的核心评估运行器
 from src.runner import EvaluationRunner
 
-# 导入我们已经实现的具体指标封装类
-from src.metrics.bertscore import BERTScoreWrapper
-from src.metrics.summac import SummaCWrapper
-from src.metrics.bleurt import BLEURTWrapper
-# from src.metrics.new_metric import NewMetricWrapper # <- 未来添加新指标时在此处取消注释
+# 具体指标封装类在 __main__ 中按需导入（它们会连带导入
+# torch/transformers 等重型依赖，冷启动要好几秒）
 
 # 忽略一些第三方库可能产生的特定警告，保持输出整洁
 warnings.filterwarnings("ignore", category=UserWarning, module='torch.utils.data')
@@ -69,6 +64,12 @@ if __name__ == "__main__":
     # ===================================================================
     print("正在初始化评估指标...")
 
+    # 按需导入指标封装类，只为真正要跑的指标付导入开销
+    from src.metrics.bertscore import BERTScoreWrapper
+    from src.metrics.summac import SummaCWrapper
+    from src.metrics.bleurt import BLEURTWrapper
+    # from src.metrics.new_metric import NewMetricWrapper # <- 未来添加新指标时在此处取消注释
+
     # 为每个指标创建一个实例。您可以传递特定参数，如 device。
     # 建议默认使用 'cpu' 以保证在没有GPU的机器上也能运行。
     # 如果您有可用的CUDA环境，可以改为 'cuda' 以获得更快的速度。
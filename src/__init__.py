@@ -0,0 +1,12 @@
+# src/__init__.py
+
+"""
+包级初始化。
+
+注意：不要在这里强制 HF_HUB_OFFLINE / TRANSFORMERS_OFFLINE——
+`local_metrics/` 只带了 BLEURT 的本地快照，BERTScore 与 SummaC 仍按
+名称从 Hub 加载模型，强制离线会让没有预热 HF 缓存的机器首次运行
+直接失败。已预热缓存、想跳过联网探测延迟的用户可自行导出
+HF_HUB_OFFLINE=1；按本地快照加载的封装（如 BERTScore）会先尝试
+local_files_only，缓存命中时同样不产生网络往返。
+"""
@@ -1,5 +1,3 @@
-import os
-os.environ['HF_ENDPOINT'] = 'https://hf-mirror.com'
 # src/metrics/base_metric.py
 
 """
@@ -19,6 +17,15 @@ class EvaluationMetric(Protocol):
     protocol to ensure they can be used interchangeably by the evaluation runner.
     """
 
+    # Metrics whose score is a cheap reduction over sentence embeddings
+    # (cosine, dot, Euclidean, ...) may set this to True. When every
+    # registered metric is vectorized, the runner encodes each column once
+    # via the first metric's `encode(texts) -> ndarray` and hands the shared
+    # matrices to each metric's `from_embeddings(pred_embs, ref_embs)`
+    # instead of calling compute(), so the expensive encode pass is not
+    # repeated per metric.
+    vectorized: bool = False
+
     def __init__(self, **kwargs) -> None:
         """
         Initializes the metric.
@@ -49,6 +56,10 @@ class EvaluationMetric(Protocol):
                                     (e.g., original texts).
             **kwargs: A dictionary for metric-specific arguments. For example,
                       some metrics might require 'sources' for consistency checks.
+                      The runner passes an optional 'cache' dict shared across
+                      metrics; embedding-based metrics may look up / store
+                      per-text encodings there (keyed by (model id, text hash))
+                      so identical sentences are encoded only once.
 
         Returns:
             Dict[str, List[float]]: A dictionary where keys are the names of the
@@ -58,3 +69,16 @@ class EvaluationMetric(Protocol):
                                     prediction-reference pair and must have the
                                     same length as the input `predictions` list.
         """
+
+    def unload(self) -> None:
+        """
+        Optionally releases heavyweight resources held by the metric.
+
+        Metrics that keep large models or embedding tensors alive (GPU
+        wrappers in particular) should drop those references here so the
+        memory can be reclaimed between metrics. The runner calls this
+        after a metric's scores have been collected; implementing it is
+        optional (the runner checks with hasattr) and a metric need not
+        support further compute() calls afterwards.
+        """
+        ...
@@ -1,14 +1,22 @@
 # src/metrics/bertscore.py
-import os
-os.environ['HF_ENDPOINT'] = 'https://hf-mirror.com'
+
 """
-Wrapper for the BERTScore metric using the Hugging Face evaluate library.
+Wrapper computing BERTScore directly from transformer token embeddings.
+
+Instead of delegating to the `evaluate` BERTScore script (which loops in
+Python per pair and re-encodes repeated texts), every unique text is
+encoded exactly once, embeddings are cached, and the greedy-alignment
+precision/recall/F1 reduces to one matmul plus two max-reductions per
+pair on the token-embedding matrices.
+
+Scoring uses the same model-specific tuned layer as the `bert_score`
+package (its `model2layers` table), so values stay comparable with the
+original pipeline's defaults. IDF weighting (off by default in
+`bert_score`) is not supported.
 """
 
+import hashlib
 from typing import List, Dict
-import evaluate
-import torch
-
 
 from .base_metric import EvaluationMetric
 
@@ -18,8 +26,10 @@ class BERTScoreWrapper:
     A wrapper class for the BERTScore metric that conforms to the
     EvaluationMetric protocol.
 
-    This class loads the metric using `evaluate.load('bertscore')` and handles
-    the computation and result formatting.
+    Encodes texts with a transformer backbone (default 'roberta-large'),
+    L2-normalizes the token embeddings and computes the greedy-align
+    P/R/F1 on-device. Unique-text embeddings and per-pair scores are both
+    cached, so repeated references cost nothing beyond the first pass.
     """
 
     def __init__(self, **kwargs):
@@ -27,19 +37,128 @@ class BERTScoreWrapper:
         Initializes the BERTScoreWrapper.
 
         Args:
-            **kwargs: Keyword arguments passed to the metric. The 'device'
-                      argument is specifically used to set the computation device.
+            **kwargs: Keyword arguments. 'device' selects the computation
+                      device, 'model_name' the encoder checkpoint,
+                      'batch_size' the encoding batch size (default 32)
+                      and 'num_layers' overrides the hidden layer used
+                      for scoring (default: bert_score's tuned layer for
+                      the model).
         """
+        # Heavy imports are deferred so that runs using only lightweight
+        # metrics do not pay the multi-second torch/transformers import cost.
+        import torch
+        from transformers import AutoTokenizer, AutoModel
+
         self.device = kwargs.get("device", "cuda" if torch.cuda.is_available() else "cpu")
-        # Pop device from kwargs if it exists, as evaluate.load doesn't use it.
-        # It's used in the compute method instead.
-        # 从 src / metrics / bertscore.py 找到 main / local_metrics / bertscore
-        current_dir = os.path.dirname(__file__)
-        # 从 'D:\...\src\metrics' 回到 'D:\...\main' 再进入 'local_metrics\bertscore'
-        metric_path = os.path.join(current_dir, '..', '..', 'local_metrics', 'bertscore')
-        kwargs.pop("device", None)
-        #self.metric = evaluate.load('bertscore', **kwargs)
-        self.metric = evaluate.load(metric_path, **kwargs)
+        self.batch_size = kwargs.get("batch_size", 32)
+        model_name = kwargs.get("model_name", "roberta-large")
+
+        print(f"Loading BERTScore encoder: {model_name}")
+        self._model_name = model_name
+        try:
+            # 本地缓存已有快照时 local_files_only 跳过 hub 的联网校验
+            # （每次构造省下几百毫秒到数秒）；没有快照时再正常联网下载
+            self.tokenizer = AutoTokenizer.from_pretrained(
+                model_name, use_fast=True, local_files_only=True
+            )
+            self.model = AutoModel.from_pretrained(model_name, local_files_only=True)
+        except OSError:
+            self.tokenizer = AutoTokenizer.from_pretrained(model_name, use_fast=True)
+            self.model = AutoModel.from_pretrained(model_name)
+        self.model = self.model.to(self.device)
+        self.model.eval()
+        if self.device.startswith("cuda"):
+            self.model = self.model.half()
+
+        # bert_score 为每个骨干模型调优了打分用的表示层（roberta-large
+        # 为第 17 层，而不是最后一层）；取同一层，保证分数与原
+        # evaluate/bert_score 路径同分布可比。bert_score 不可用或不认识
+        # 该模型时退回最后一层。
+        try:
+            from bert_score.utils import model2layers
+            default_layer = model2layers[model_name]
+        except (ImportError, KeyError):
+            default_layer = self.model.config.num_hidden_layers
+        self.num_layers = kwargs.get("num_layers", default_layer)
+
+        # 每个唯一文本的 token embedding 只编码一次（数据集中所有行共享
+        # 同一参考文本，复用率极高）。运行器可通过 compute 的 cache 参数
+        # 注入跨指标共享的缓存字典，此处仅作默认兜底。
+        self._emb_cache: Dict[tuple, "torch.Tensor"] = {}
+        # 按 (参考, 预测) 文本对缓存各项分数
+        self._pair_cache: Dict[tuple, Dict[str, float]] = {}
+
+    def unload(self) -> None:
+        """
+        Drops the encoder and cached embedding tensors so the next metric
+        can load onto a clean device. Per-pair float scores are kept.
+        """
+        import torch
+
+        self.model = None
+        self.tokenizer = None
+        self._emb_cache.clear()
+        if self.device.startswith("cuda"):
+            torch.cuda.empty_cache()
+
+    def _emb_key(self, text: str) -> tuple:
+        """
+        Cache key for one text: (model id, 16-byte blake2b digest). Hash
+        keys keep the shared cache small even for long report texts.
+        """
+        digest = hashlib.blake2b(text.encode('utf-8'), digest_size=16).digest()
+        return (self._model_name, digest)
+
+    def _encode_unique(self, texts: List[str], emb_cache: dict) -> None:
+        """
+        Encodes every not-yet-cached unique text and stores its
+        L2-normalized token-embedding matrix (special tokens stripped).
+        """
+        import torch
+
+        todo = [t for t in dict.fromkeys(texts) if self._emb_key(t) not in emb_cache]
+        for start in range(0, len(todo), self.batch_size):
+            batch = todo[start:start + self.batch_size]
+            inputs = self.tokenizer(
+                batch,
+                return_tensors='pt',
+                truncation=True,
+                padding=True,
+                return_special_tokens_mask=True,
+            )
+            special_mask = inputs.pop('special_tokens_mask').bool()
+            inputs = {k: v.to(self.device) for k, v in inputs.items()}
+
+            with torch.inference_mode():
+                # hidden_states[0] 是输入 embedding，第 i 层输出在下标 i，
+                # 因此可以直接用层号索引
+                hidden = self.model(
+                    **inputs, output_hidden_states=True
+                ).hidden_states[self.num_layers]
+
+            hidden = torch.nn.functional.normalize(hidden.float(), dim=-1)
+            attention = inputs['attention_mask'].bool().cpu()
+            # Keep only real content tokens: attended and not special.
+            keep = attention & ~special_mask
+            for row, text in enumerate(batch):
+                emb_cache[self._emb_key(text)] = hidden[row][keep[row]]
+
+    def _score_pair(self, reference: str, prediction: str, emb_cache: dict) -> Dict[str, float]:
+        """
+        Greedy-alignment BERTScore for one pair from cached embeddings:
+        one matmul plus a max-reduction along each axis.
+        """
+        ref_emb = emb_cache[self._emb_key(reference)]    # [Lr, D]
+        pred_emb = emb_cache[self._emb_key(prediction)]  # [Lp, D]
+        if ref_emb.numel() == 0 or pred_emb.numel() == 0:
+            return {"precision": 0.0, "recall": 0.0, "f1": 0.0}
+
+        sim = ref_emb @ pred_emb.T              # [Lr, Lp] cosine matrix
+        recall = float(sim.amax(dim=1).mean())
+        precision = float(sim.amax(dim=0).mean())
+        denominator = precision + recall
+        f1 = 2 * precision * recall / denominator if denominator > 0 else 0.0
+        return {"precision": precision, "recall": recall, "f1": f1}
 
     def compute(
             self,
@@ -53,8 +172,8 @@ class BERTScoreWrapper:
         Args:
             predictions (List[str]): The list of generated texts.
             references (List[str]): The list of reference texts.
-            **kwargs: Additional arguments for the metric's compute function.
-                      'lang' can be passed here, defaults to 'en'.
+            **kwargs: 'cache' may carry the runner's shared embedding
+                      cache dict; other arguments are ignored.
 
         Returns:
             Dict[str, List[float]]: A dictionary containing precision, recall,
@@ -62,21 +181,28 @@ class BERTScoreWrapper:
                                     'bertscore_precision', 'bertscore_recall',
                                     and 'bertscore_f1'.
         """
-        lang = kwargs.get("lang", "en")  # Default to English for BERTScore
+        if not predictions:
+            return {}
+
+        shared_cache = kwargs.get("cache")
+        emb_cache = shared_cache if shared_cache is not None else self._emb_cache
 
-        scores = self.metric.compute(
-            predictions=predictions,
-            references=references,
-            lang=lang,
-            device=self.device
-        )
+        # Only score pairs we have not seen before.
+        keys = [(hash(ref), hash(pred)) for ref, pred in zip(references, predictions)]
+        todo = [i for i, key in enumerate(keys) if key not in self._pair_cache]
 
-        # The 'hashcode' key is not needed in the final output.
-        scores.pop("hashcode", None)
+        if todo:
+            self._encode_unique(
+                [references[i] for i in todo] + [predictions[i] for i in todo],
+                emb_cache,
+            )
+            for i in todo:
+                self._pair_cache[keys[i]] = self._score_pair(
+                    references[i], predictions[i], emb_cache
+                )
 
         # Format the output to match the EvaluationMetric protocol.
-        formatted_scores = {
-            f"bertscore_{key}": value for key, value in scores.items()
+        return {
+            f"bertscore_{name}": [self._pair_cache[key][name] for key in keys]
+            for name in ("precision", "recall", "f1")
         }
-
-        return formatted_scores
\ No newline at end of file
@@ -1,52 +1,82 @@
 # src/metrics/bleu.py
-import os
-import sys
+from concurrent.futures import ProcessPoolExecutor
 from typing import List, Dict
 
-current_dir = os.path.dirname(__file__)
-local_metrics_path = os.path.join(current_dir, '..', '..', 'local_metrics')
-sys.path.append(local_metrics_path)
+from nltk.translate.bleu_score import sentence_bleu
 
-from bleu.bleu import Bleu
 from .base_metric import EvaluationMetric
 
 
+def _sentence_bleu_pair(pair) -> float:
+    """
+    Scores a single (prediction, reference) pair; module-level so it can be
+    pickled into worker processes.
+    """
+    pred, ref = pair
+    return sentence_bleu([ref.split()], pred.split())
+
+
 class BleuWrapper(EvaluationMetric):
     """
     A wrapper class for the BLEU metric that conforms to the EvaluationMetric protocol.
-    Loads the metric from a local path.
+
+    Computes a genuine per-sample sentence BLEU for every row instead of
+    duplicating one corpus-level score across all rows.
     """
 
+    # Spawning worker processes is not worth it below this many pairs.
+    _MIN_PARALLEL_PAIRS = 32
+
     def __init__(self, **kwargs):
         """
-        Initializes the BleuWrapper from a local checkpoint.
+        Initializes the BleuWrapper.
+
+        Pass `device='cuda'` to count n-grams on GPU via the TensorBleu
+        backend; otherwise sentence BLEU is computed on CPU, in parallel
+        worker processes for larger inputs (the counting is pure Python
+        and therefore GIL-bound).
         """
-        print("Initializing BLEU by direct import from local_metrics...")
-        self.metric = Bleu(**kwargs)
-        # current_dir = os.path.dirname(__file__)
-        #
-        # metric_path = os.path.join(current_dir, '..', '..', 'local_metrics', 'bleu')
-        #
-        # print(f"Loading BLEU from local path: {metric_path}")
-        # self.metric = evaluate.load(metric_path, **kwargs)
+        device = kwargs.pop("device", None)
+        if device is not None and device.startswith("cuda"):
+            # Imported lazily: TensorBleu pulls in torch, which CPU-only
+            # runs should not have to pay for.
+            from .tensor_bleu import TensorBleu
+
+            print("Initializing BLEU with the GPU TensorBleu backend...")
+            self.metric = TensorBleu(device=device, **kwargs)
+        else:
+            print("Initializing BLEU with per-sentence NLTK scoring...")
+            self.metric = None
 
     def compute(
             self,
             predictions: List[str],
-            references: List[List[str]],
+            references: List[str],
             **kwargs
     ) -> Dict[str, List[float]]:
         """
-        Computes BLEU score.
-        """
-        # Note: The 'evaluate' library's BLEU metric expects references to be a list of lists.
-        # We will wrap each reference in a list to match this format.
-        formatted_references = [[ref] for ref in references]
+        Computes one sentence-level BLEU score per (prediction, reference) pair.
 
-        results = self.metric.compute(predictions=predictions, references=formatted_references, **kwargs)
+        Duplicate pairs are scored once, and identical prediction/reference
+        pairs (e.g. the self-comparison baseline row) short-circuit to the
+        exact score of 1.0 without any counting.
+        """
+        unique_pairs = list(dict.fromkeys(zip(predictions, references)))
+        score_map = {pair: 1.0 for pair in unique_pairs if pair[0] == pair[1]}
+        todo = [pair for pair in unique_pairs if pair not in score_map]
 
-        bleu_score = results.get('bleu', 0.0)
+        if not todo:
+            scores = []
+        elif self.metric is not None:
+            scores = self.metric.compute_per_sentence(
+                [pred for pred, _ in todo],
+                [[ref] for _, ref in todo],
+            )
+        elif len(todo) >= self._MIN_PARALLEL_PAIRS:
+            with ProcessPoolExecutor() as executor:
+                scores = list(executor.map(_sentence_bleu_pair, todo, chunksize=8))
+        else:
+            scores = [_sentence_bleu_pair(pair) for pair in todo]
 
-        # Duplicate the corpus-level score for each prediction to maintain consistency.
-        num_predictions = len(predictions)
-        return {"bleu_score": [bleu_score] * num_predictions}
\ No newline at end of file
+        score_map.update(zip(todo, scores))
+        return {"bleu_score": [score_map[pair] for pair in zip(predictions, references)]}
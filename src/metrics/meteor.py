@@ -1,25 +1,51 @@
 # src/metrics/meteor.py
-import os
+from concurrent.futures import ProcessPoolExecutor
 from typing import List, Dict
-import evaluate
+
 import nltk
+from nltk.translate.meteor_score import single_meteor_score
+
 from .base_metric import EvaluationMetric
 
+# 模块级缓存：wordnet 資源檢查會走訪 nltk.data.path 下的每個目錄做
+# os.path.exists，每次構造都要 5-50 ms；檢查通過一次後直接跳過
+_WORDNET_READY = False
+
+
+def _meteor_pair(pair) -> float:
+    """
+    Scores a single (reference tokens, prediction) pair in a worker process.
+    The reference side arrives pre-tokenized (see the cache in compute).
+    """
+    ref_tokens, pred = pair
+    return single_meteor_score(ref_tokens, nltk.word_tokenize(pred))
+
 
 class MeteorWrapper(EvaluationMetric):
     """
     A wrapper class for the METEOR metric that conforms to the EvaluationMetric protocol.
-    Loads the metric from a local path.
+
+    Computes a genuine per-sample METEOR score for every row via NLTK's
+    single_meteor_score instead of duplicating one corpus-level score
+    across rows. The alignment search is pure Python (GIL-bound), so
+    larger inputs are scored in parallel worker processes.
     """
 
+    # Spawning worker processes is not worth it below this many pairs.
+    _MIN_PARALLEL_PAIRS = 32
+
     def __init__(self, **kwargs):
         """
-        Initializes the MeteorWrapper from a local checkpoint.
-        Ensures the 'wordnet' resource from NLTK is available.
+        Initializes the MeteorWrapper.
+        Ensures the 'wordnet' resource from NLTK is available (the check
+        itself is cached at module level across instantiations).
         """
+        global _WORDNET_READY
         try:
-            # 檢查 'wordnet' 是否存在
-            nltk.data.find('corpora/wordnet.zip')
+            # 檢查 'wordnet' 是否存在（已確認過則跳過路徑掃描）
+            if not _WORDNET_READY:
+                nltk.data.find('corpora/wordnet.zip')
+                _WORDNET_READY = True
         except LookupError:
             # --- 修正：捕捉正確的 LookupError 異常 ---
             print("=" * 80)
@@ -34,17 +60,23 @@ class MeteorWrapper(EvaluationMetric):
                 print(f"   - {path}")
             print("=" * 80)
             # 即使手動指導後，仍然嘗試下載，以防萬一網路是通的
+            # （注意 nltk.download 失敗時返回 False 而不是拋異常）
             try:
-                nltk.download('wordnet')
+                downloaded = nltk.download('wordnet')
             except Exception as e:
-                # 如果下載仍然失敗，則拋出更明確的錯誤
                 raise LookupError("自動下載 'wordnet' 失敗。請遵循上面的手動說明。") from e
+            if not downloaded:
+                # 如果下載仍然失敗，則拋出更明確的錯誤
+                raise LookupError("自動下載 'wordnet' 失敗。請遵循上面的手動說明。")
+            _WORDNET_READY = True
 
-        current_dir = os.path.dirname(__file__)
-        metric_path = os.path.join(current_dir, '..', '..', 'local_metrics', 'meteor')
+        # 預熱 WordNet，避免第一次打分時才觸發惰性載入
+        from nltk.corpus import wordnet
+        wordnet.ensure_loaded()
 
-        print(f"Loading METEOR from local path: {metric_path}")
-        self.metric = evaluate.load(metric_path, **kwargs)
+        # 參考文本的分詞快取。數據集中所有行共享同一參考文本
+        # （見 load_data_from_files），只需分詞一次即可重複使用。
+        self._ref_tokens_cache: Dict[str, List[str]] = {}
 
     def compute(
             self,
@@ -53,11 +85,30 @@ class MeteorWrapper(EvaluationMetric):
             **kwargs
     ) -> Dict[str, List[float]]:
         """
-        Computes METEOR score.
+        Computes one METEOR score per (prediction, reference) pair.
         """
-        results = self.metric.compute(predictions=predictions, references=references, **kwargs)
-        meteor_score = results.get('meteor', 0.0)
+        # 每個唯一的參考文本只分詞一次（O(unique refs) 而非 O(N)）
+        for ref in references:
+            if ref not in self._ref_tokens_cache:
+                self._ref_tokens_cache[ref] = nltk.word_tokenize(ref)
+
+        # 重複的 (參考, 預測) 文本對只打分一次，再散射回每一行
+        # （METEOR 的碎片化懲罰使得自比較分數並非精確的 1.0，
+        # 因此相同文本對仍需真正跑一次打分）
+        unique_pairs = list(dict.fromkeys(zip(references, predictions)))
+        work_items = [
+            (self._ref_tokens_cache[ref], pred) for ref, pred in unique_pairs
+        ]
+
+        if len(work_items) >= self._MIN_PARALLEL_PAIRS:
+            with ProcessPoolExecutor() as executor:
+                unique_scores = list(executor.map(_meteor_pair, work_items, chunksize=8))
+        else:
+            unique_scores = [_meteor_pair(item) for item in work_items]
 
-        # Duplicate the corpus-level score for each prediction.
-        num_predictions = len(predictions)
-        return {"meteor_score": [meteor_score] * num_predictions}
\ No newline at end of file
+        score_map = dict(zip(unique_pairs, unique_scores))
+        return {
+            "meteor_score": [
+                score_map[pair] for pair in zip(references, predictions)
+            ]
+        }
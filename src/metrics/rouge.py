@@ -1,25 +1,52 @@
 # src/metrics/rouge.py
-import os
+from concurrent.futures import ProcessPoolExecutor
 from typing import List, Dict
-import evaluate
+
+from rouge_score import rouge_scorer
+
 from .base_metric import EvaluationMetric
 
+_ROUGE_TYPES = ['rouge1', 'rouge2', 'rougeL']
+
+# Per-worker scorer, built once by the pool initializer instead of being
+# pickled per task (the stemmer is not cheap to construct).
+_worker_scorer = None
+
+
+def _init_rouge_worker():
+    global _worker_scorer
+    _worker_scorer = rouge_scorer.RougeScorer(_ROUGE_TYPES, use_stemmer=True)
+
+
+def _score_pair(pair) -> List[float]:
+    """
+    Scores a single (reference, prediction) pair in a worker process and
+    returns the F-measures in _ROUGE_TYPES order.
+    """
+    ref, pred = pair
+    scores = _worker_scorer.score(ref, pred)
+    return [scores[rouge_type].fmeasure for rouge_type in _ROUGE_TYPES]
+
 
 class RougeWrapper(EvaluationMetric):
     """
     A wrapper class for the ROUGE metric that conforms to the EvaluationMetric protocol.
-    Loads the metric from a local path.
+
+    Computes genuine per-sample ROUGE F-measures with rouge_score's
+    RougeScorer instead of duplicating one corpus-level score across rows.
+    Stemming and LCS are pure Python (GIL-bound), so larger inputs are
+    scored in parallel worker processes.
     """
 
+    # Spawning worker processes is not worth it below this many pairs.
+    _MIN_PARALLEL_PAIRS = 32
+
     def __init__(self, **kwargs):
         """
-        Initializes the RougeWrapper from a local checkpoint.
+        Initializes the RougeWrapper with a reusable RougeScorer.
         """
-        current_dir = os.path.dirname(__file__)
-        metric_path = os.path.join(current_dir, '..', '..', 'local_metrics', 'rouge')
-
-        print(f"Loading ROUGE from local path: {metric_path}")
-        self.metric = evaluate.load(metric_path, **kwargs)
+        print("Initializing ROUGE with rouge_score.RougeScorer...")
+        self.scorer = rouge_scorer.RougeScorer(_ROUGE_TYPES, use_stemmer=True)
 
     def compute(
             self,
@@ -28,16 +55,33 @@ class RougeWrapper(EvaluationMetric):
             **kwargs
     ) -> Dict[str, List[float]]:
         """
-        Computes ROUGE scores.
-        """
-        results = self.metric.compute(predictions=predictions, references=references, **kwargs)
-
-        num_predictions = len(predictions)
-        formatted_scores = {}
+        Computes per-sample ROUGE-1/2/L F-measures.
 
+        Duplicate pairs are scored once, and identical prediction/reference
+        pairs (e.g. the self-comparison baseline row) short-circuit to the
+        exact F-measure of 1.0.
+        """
+        unique_pairs = list(dict.fromkeys(zip(references, predictions)))
+        row_map = {
+            pair: [1.0] * len(_ROUGE_TYPES)
+            for pair in unique_pairs if pair[0] == pair[1]
+        }
+        todo = [pair for pair in unique_pairs if pair not in row_map]
 
-        for key, value in results.items():
-            # 將單一的 corpus-level 分數複製 N 份，N 為樣本數
-            formatted_scores[f"rouge_{key}"] = [value] * num_predictions
+        if not todo:
+            rows = []
+        elif len(todo) >= self._MIN_PARALLEL_PAIRS:
+            with ProcessPoolExecutor(initializer=_init_rouge_worker) as executor:
+                rows = list(executor.map(_score_pair, todo, chunksize=8))
+        else:
+            rows = [
+                [self.scorer.score(ref, pred)[t].fmeasure for t in _ROUGE_TYPES]
+                for ref, pred in todo
+            ]
 
-        return formatted_scores
\ No newline at end of file
+        row_map.update(zip(todo, rows))
+        ordered_rows = [row_map[pair] for pair in zip(references, predictions)]
+        return {
+            f"rouge_{rouge_type}": [row[i] for row in ordered_rows]
+            for i, rouge_type in enumerate(_ROUGE_TYPES)
+        }